@@ -272,42 +272,54 @@ if os.environ.get("GW_START_LOGGING", False):
 config.set_gmxrc_environment(config.cfg.getpath("Gromacs", "GMXRC"))
 
 
-# Add gromacs command **instances** to the top level.
+# Make gromacs command **instances** available at the top level.
 # These serve as the equivalence of running commands in the shell.
-# (Note that each gromacs command is actually run when the instance is
-# created in order to gather the documentation string.)
+# (The instances are created lazily on first attribute access in
+# __getattr__ below.)
 from . import tools
 
-# Ignore warnings from a few programs that do not produce
-# documentation when run with '-h' (only applies when the default for
-# failuremode of core.GromacsCommand is changed to 'warn')
-warnings.simplefilter("ignore", GromacsFailureWarning)
-_have_g_commands = []
-_missing_g_commands = []
-for clsname, cls in tools.registry.items():
-    name = clsname[0].lower() + clsname[1:]  # instances should start with lower case
-    try:
-        globals()[name] = cls()  # add instance of command for immediate use
-        _have_g_commands.append(name)
-    except:
-        _missing_g_commands.append(name)
 warnings.simplefilter("always", GromacsFailureWarning)
 warnings.simplefilter("always", GromacsImportWarning)
 
-_have_g_commands.sort()
-_missing_g_commands.sort()
-if len(_missing_g_commands) > 0:
-    warnings.warn(
-        "Some Gromacs commands were NOT found; "
-        "maybe source GMXRC first? The following are missing:\n%r\n"
-        % _missing_g_commands,
-        category=GromacsImportWarning,
-    )
+# instances should start with lower case; the registry only holds
+# lightweight specs at this point, no class is built yet
+_command_names = {
+    clsname[0].lower() + clsname[1:]: clsname for clsname in tools.registry
+}
+
 
-del name, cls, clsname
+def __getattr__(name):
+    """Create Gromacs command instances on first access (:pep:`562`).
 
-# get ALL active command instances with 'from gromacs import *'
-__all__.extend(_have_g_commands)
+    Tool classes and their top-level instances (e.g. :class:`gromacs.grompp`)
+    are materialized lazily instead of eagerly instantiating every
+    registered command at import time. A command that cannot be set up
+    (e.g. because Gromacs is not found; maybe source ``GMXRC`` first?)
+    raises :exc:`AttributeError` on access.
+    """
+    try:
+        clsname = _command_names[name]
+    except KeyError:
+        raise AttributeError(
+            "module {0!r} has no attribute {1!r}".format(__name__, name)
+        ) from None
+    try:
+        instance = tools.registry[clsname]()
+    except Exception as err:
+        warnings.warn(
+            "Gromacs command {0!r} is not available ({1}); "
+            "maybe source GMXRC first?".format(name, err),
+            category=GromacsImportWarning,
+        )
+        raise AttributeError(
+            "Gromacs command {0!r} is not available".format(name)
+        ) from err
+    globals()[name] = instance  # cache the instance for subsequent accesses
+    return instance
+
+
+# get ALL command instances with 'from gromacs import *'
+__all__.extend(sorted(_command_names))
 
 
 # cbook should come after the whole of init as it relies on command
@@ -225,6 +225,7 @@ completely transparent to the user.
 .. autodata:: qscript_template
 
 """
+import functools
 import os
 import logging
 import re
@@ -563,6 +564,9 @@ def get_configuration(filename=CONFIGNAME):
     #: global configuration data accessible
     cfg = GMXConfigParser(filename=filename)  # update module-level cfg
     globals().update(cfg.configuration)  # update configdir, templatesdir ...
+    get_boolean.cache_clear()  # memoized lookups refer to the old cfg
+    _parse_tool_names.cache_clear()
+    _parse_extra_tool_names.cache_clear()
     configuration = cfg.configuration  # update module-level configuration
     return cfg
 
@@ -681,23 +685,50 @@ def set_gmxrc_environment(gmxrc):
         )
 
 
-def get_tool_names():
-    """Get tool names from all configured groups.
+@functools.lru_cache(maxsize=None)
+def get_boolean(section, option, fallback=False):
+    """Memoized :meth:`cfg.getboolean` lookup.
 
-    :return: list of tool names
+    The configuration does not change behind our back (a re-read via
+    :func:`get_configuration` clears the memo), so repeated lookups of
+    the same option do not have to re-parse the raw value.
     """
+    return cfg.getboolean(section, option, fallback=fallback)
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_tool_names():
     names = []
     for group in cfg.get("Gromacs", "groups").split():
         names.extend(cfg.get("Gromacs", group).split())
-    return names
+    return tuple(names)
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_extra_tool_names():
+    return tuple(cfg.get("Gromacs", "extra").split())
+
+
+def get_tool_names():
+    """Get tool names from all configured groups.
+
+    The raw option strings are only parsed once per configuration (the
+    memo is cleared when :func:`get_configuration` re-reads the file).
+
+    :return: list of tool names
+    """
+    return list(_parse_tool_names())
 
 
 def get_extra_tool_names():
     """Get tool names from all configured groups.
 
+    The raw option string is only parsed once per configuration (the
+    memo is cleared when :func:`get_configuration` re-reads the file).
+
     :return: list of tool names
     """
-    return cfg.get("Gromacs", "extra").split()
+    return list(_parse_extra_tool_names())
 
 
 RELEASE = None
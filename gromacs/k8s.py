@@ -0,0 +1,618 @@
+# -*- coding: utf-8 -*-
+# GromacsWrapper: k8s.py
+# Released under the GNU Public License 3 (or higher, your choice)
+# See the file COPYING for details.
+
+""":mod:`gromacs.k8s` -- Running simulations on Kubernetes
+=======================================================
+
+The :mod:`gromacs.k8s` module contains the :class:`MDrunnerK8s` class that
+launches :program:`gmx mdrun` inside a `Kubernetes`_ Job instead of as a local
+process. The input files must reside on a shared filesystem that is available
+both to the Python process and to the pod through a
+:abbr:`PVC (PersistentVolumeClaim)`.
+
+All interaction with the cluster control plane goes through the in-process
+`Kubernetes Python client`_ (a single cached
+:class:`kubernetes.client.ApiClient` is shared by all instances) so no
+:program:`kubectl` processes have to be forked for job management; only the
+actual ``mdrun`` invocation is executed with :program:`kubectl exec` because
+:meth:`MDrunner.run` drives it as a local subprocess.
+
+.. _Kubernetes: https://kubernetes.io/
+.. _Kubernetes Python client: https://github.com/kubernetes-client/python
+
+Requirements
+------------
+
+The module needs the optional dependency :mod:`kubernetes`
+(install with ``pip install GromacsWrapper[k8s]``) and a cluster configuration,
+either in-cluster (when running inside a pod) or from ``~/.kube/config``.
+
+Example
+-------
+
+Run a simulation in a pod with 4 cores, with the input files in the current
+directory on the volume bound to the claim ``shared-data``::
+
+  import gromacs.k8s
+  mdrun = gromacs.k8s.MDrunnerK8s(pvc="shared-data", cores=4,
+                                  s="md.tpr", deffnm="md")
+  rc = mdrun.run()
+
+Classes
+-------
+
+.. autoclass:: MDrunnerK8s
+   :members:
+
+"""
+__docformat__ = "restructuredtext en"
+
+import os
+import re
+import sys
+import socket
+import threading
+import uuid
+import logging
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from kubernetes import client as k8s_client, config as k8s_config, watch as k8s_watch
+
+from .exceptions import GromacsError
+from .run import MDrunner
+
+logger = logging.getLogger("gromacs.k8s")
+
+#: Location of the namespace file inside a pod (used to detect the
+#: namespace when running in-cluster).
+SERVICEACCOUNT_NAMESPACE = "/var/run/secrets/kubernetes.io/serviceaccount/namespace"
+
+#: Mount table used for detecting the persistent volume that backs the
+#: run directory.
+PROC_MOUNTS = "/proc/mounts"
+
+
+class MDrunnerK8s(MDrunner):
+    """Manage running :program:`mdrun` as a Kubernetes Job.
+
+    :meth:`prehook` creates a Job whose pod mounts the *pvc* under *workdir*
+    and idles; the actual ``mdrun`` command is then executed inside the pod
+    (:program:`kubectl exec`) so that its lifetime, standard streams and exit
+    code are handled by :meth:`MDrunner.run` exactly as for a local run.
+    :meth:`posthook` deletes the Job again.
+
+    Pod readiness is push-based: the container POSTs to an HTTP listener in
+    this process as soon as it starts (see :meth:`_wait_ready`), so
+    :meth:`prehook` returns as soon as the pod boots instead of at the next
+    poll interval; an apiserver watch serves as fallback.
+
+    :Keywords:
+       *pvc*
+           name of the PersistentVolumeClaim with the input files; if not
+           provided it is detected from the volume that backs *dirname*
+           (raises :exc:`ValueError` when nothing can be detected)
+       *jobname*
+           name of the Job (and value of its ``job`` label)
+           ["mdrun-<pid>"]
+       *image*
+           container image with GROMACS [:attr:`image`]
+       *namespace*
+           Kubernetes namespace; detected from the in-cluster service account
+           or the kubeconfig context if not provided ["default"]
+       *workdir*
+           mount point of *pvc* inside the pod; *dirname* must be reachable
+           through it ["/mnt"]
+       *cores*
+           number of CPU cores to request [1]
+       *memory*
+           amount of memory to request ["4Gi"]
+       *gpus*
+           number of ``nvidia.com/gpu`` devices to request [0]
+       *kwargs*
+           remaining keyword arguments are passed to :class:`MDrunner`
+
+    .. versionadded:: 0.9.0
+    """
+
+    #: ``mdrun`` is run inside the container image; no local executable is
+    #: needed (see :meth:`_find_command`).
+    mdrun = "gmx mdrun"
+    mpiexec = None
+
+    #: Default container image with GROMACS.
+    image = "gromacs/gromacs"
+
+    #: Cached :class:`kubernetes.client.ApiClient`, shared by all instances
+    #: and initialized lazily by :meth:`_get_api_client`.
+    _api_client = None
+
+    #: Shared HTTP listener for readiness callbacks from the pods; lazily
+    #: started on an ephemeral port by :meth:`_get_ready_server`.
+    _ready_server = None
+    #: Maps jobname to the :class:`threading.Event` of the waiting runner.
+    _ready_events = {}
+    _ready_lock = threading.Lock()
+
+    #: Runners staged with ``prehook(defer=True)``, submitted together by
+    #: :meth:`flush_pending`.
+    _pending = []
+    _pending_lock = threading.Lock()
+
+    def __init__(self, dirname=os.path.curdir, **kwargs):
+        self.jobname = kwargs.pop("jobname", "mdrun-{0:d}".format(os.getpid()))
+        self.image = kwargs.pop("image", self.image)
+        self.namespace = kwargs.pop("namespace", None) or self._default_namespace()
+        self.pvc = kwargs.pop("pvc", None) or self._find_pvc(dirname)
+        if self.pvc is None:
+            raise ValueError(
+                "MDrunnerK8s requires the name of a "
+                "PersistentVolumeClaim (pvc=...) and none "
+                "could be detected for {0!r}".format(dirname)
+            )
+        self.workdir = kwargs.pop("workdir", "/mnt")
+        self.cores = kwargs.pop("cores", 1)
+        self.memory = kwargs.pop("memory", "4Gi")
+        self.gpus = kwargs.pop("gpus", 0)
+        self._batch = None
+        self._submitted = False
+        super(MDrunnerK8s, self).__init__(dirname=dirname, **kwargs)
+
+    def _find_command(self):
+        # mdrun only has to exist inside the container image, so do not
+        # require it on the local PATH as MDrunner does
+        driver, name = self.mdrun.split()
+        return driver, name
+
+    @classmethod
+    def _get_api_client(cls):
+        """Return the shared :class:`kubernetes.client.ApiClient`.
+
+        The client (and the cluster configuration) is only created once and
+        then reused for all API calls of all instances.
+        """
+        if cls._api_client is None:
+            try:
+                k8s_config.load_incluster_config()
+            except k8s_config.ConfigException:
+                k8s_config.load_kube_config()
+            cls._api_client = k8s_client.ApiClient()
+        return cls._api_client
+
+    class _ReadyHandler(BaseHTTPRequestHandler):
+        """Accepts ``POST /ready/<jobname>`` callbacks from the pods."""
+
+        def do_POST(self):
+            jobname = self.path.rstrip("/").rpartition("/")[2]
+            with MDrunnerK8s._ready_lock:
+                event = MDrunnerK8s._ready_events.get(jobname)
+            if event is not None:
+                event.set()
+                self.send_response(204)
+            else:
+                self.send_response(404)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            logger.debug("readiness callback: " + format, *args)
+
+    @classmethod
+    def _get_ready_server(cls):
+        """Return the shared readiness listener, starting it if necessary."""
+        if cls._ready_server is None:
+            server = ThreadingHTTPServer(("", 0), cls._ReadyHandler)
+            thread = threading.Thread(
+                target=server.serve_forever, name="k8s-ready-listener", daemon=True
+            )
+            thread.start()
+            cls._ready_server = server
+            logger.debug(
+                "Started readiness listener on port %d", server.server_address[1]
+            )
+        return cls._ready_server
+
+    @staticmethod
+    def _local_address():
+        """IP address of this host as seen by the cluster."""
+        # connecting a UDP socket does not send any packets but makes the
+        # kernel pick the outgoing interface for us
+        target = os.environ.get("KUBERNETES_SERVICE_HOST", "8.8.8.8")
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.connect((target, 53))
+            return sock.getsockname()[0]
+        finally:
+            sock.close()
+
+    @classmethod
+    def _callback_url(cls):
+        """Base URL that pods use to signal readiness."""
+        port = cls._get_ready_server().server_address[1]
+        return "http://{0}:{1:d}".format(cls._local_address(), port)
+
+    @staticmethod
+    def _default_namespace():
+        """Detect the namespace from the service account or the kubeconfig."""
+        try:
+            with open(SERVICEACCOUNT_NAMESPACE) as namespace_file:
+                return namespace_file.read().strip()
+        except OSError:
+            pass
+        try:
+            _, active_context = k8s_config.list_kube_config_contexts()
+            return active_context["context"].get("namespace", "default")
+        except (k8s_config.ConfigException, KeyError, TypeError):
+            return "default"
+
+    @staticmethod
+    def _find_backing_volume(path):
+        """Return the ``pvc-<uid>`` volume name of the mount containing *path*.
+
+        The mount table is read from ``/proc/mounts`` (no external
+        processes); returns ``None`` when *path* is not backed by a
+        provisioned persistent volume.
+        """
+        path = os.path.realpath(path)
+        mountpoint, source = "", None
+        try:
+            with open(PROC_MOUNTS) as mounts:
+                for line in mounts:
+                    fields = line.split()
+                    if len(fields) < 2:
+                        continue
+                    candidate = fields[1].rstrip("/")
+                    if (path + "/").startswith(candidate + "/") and len(
+                        candidate
+                    ) >= len(mountpoint):
+                        mountpoint, source = candidate, fields[0]
+        except OSError:
+            return None
+        if source is None:
+            return None
+        m = re.search(r"pvc-[0-9a-f-]+", source)
+        return m.group(0) if m else None
+
+    def _find_pvc(self, dirname):
+        """Detect the claim whose volume backs *dirname*.
+
+        A single ``list_namespaced_persistent_volume_claim`` call maps the
+        volume name from the mount table to the claim name; no apiserver
+        round trip is made at all when *dirname* is not on a persistent
+        volume.
+        """
+        volume = self._find_backing_volume(dirname)
+        if volume is None:
+            return None
+        core_api = k8s_client.CoreV1Api(self._get_api_client())
+        claims = core_api.list_namespaced_persistent_volume_claim(self.namespace)
+        for claim in claims.items:
+            if claim.spec.volume_name == volume:
+                logger.info("Detected PVC %r backing %r", claim.metadata.name, dirname)
+                return claim.metadata.name
+        return None
+
+    def _make_job(self):
+        """Return the Job manifest as a nested dict.
+
+        The manifest is built natively (no YAML templating and
+        re-parsing); the API client serializes it exactly once when the
+        Job is created.
+        """
+        labels = {"job": self.jobname}
+        if self._batch:
+            labels["mdrun-batch"] = self._batch
+        resources = {"cpu": self.cores, "memory": self.memory}
+        if self.gpus:
+            resources["nvidia.com/gpu"] = self.gpus
+        container = {
+            "name": "mdrun",
+            "image": self.image,
+            "workingDir": self.workdir,
+            "command": [
+                "sh",
+                "-c",
+                'curl -fsm5 -X POST "$CALLBACK_URL/ready/$JOBNAME" || true; '
+                "exec sleep infinity",
+            ],
+            "env": [
+                {"name": "CALLBACK_URL", "value": self._callback_url()},
+                {"name": "JOBNAME", "value": self.jobname},
+            ],
+            "resources": {"requests": dict(resources), "limits": dict(resources)},
+            "volumeMounts": [{"name": "workdir", "mountPath": self.workdir}],
+        }
+        return {
+            "apiVersion": "batch/v1",
+            "kind": "Job",
+            "metadata": {"name": self.jobname, "labels": dict(labels)},
+            "spec": {
+                "backoffLimit": 0,
+                "template": {
+                    "metadata": {"labels": dict(labels)},
+                    "spec": {
+                        "restartPolicy": "Never",
+                        "containers": [container],
+                        "volumes": [
+                            {
+                                "name": "workdir",
+                                "persistentVolumeClaim": {"claimName": self.pvc},
+                            }
+                        ],
+                    },
+                },
+            },
+        }
+
+    def _wait_pod_running(self, timeout=300):
+        """Block until the pod of the Job reaches phase ``Running``.
+
+        Uses a server-side watch instead of polling; raises
+        :exc:`~gromacs.exceptions.GromacsError` when *timeout* (in seconds)
+        expires first.
+        """
+        core_api = k8s_client.CoreV1Api(self._get_api_client())
+        watcher = k8s_watch.Watch()
+        # the phase condition is evaluated server-side: the stream only
+        # carries events for pods that are actually Running, so nothing
+        # has to be scanned or re-checked here; resource_version="0" lets
+        # the apiserver answer the initial list from its watch cache
+        # instead of etcd
+        for event in watcher.stream(
+            core_api.list_namespaced_pod,
+            self.namespace,
+            label_selector="job={0}".format(self.jobname),
+            field_selector="status.phase=Running",
+            resource_version="0",
+            timeout_seconds=timeout,
+        ):
+            if event["type"] in ("ADDED", "MODIFIED"):
+                watcher.stop()
+                logger.info("Pod of job %r is running", self.jobname)
+                return
+        raise GromacsError(
+            "Timed out after {0:d} s waiting for the pod of job {1!r}".format(
+                timeout, self.jobname
+            )
+        )
+
+    def _wait_ready(self, timeout=300, fallback=True):
+        """Wait until the pod has signalled readiness.
+
+        The pod POSTs to the readiness listener the moment its container
+        starts so the normal path returns without any apiserver round trip;
+        a concurrent :meth:`_wait_pod_running` watch acts as fallback for
+        images that cannot reach the listener (e.g. no ``curl``, or the
+        Python process is not routable from the cluster). Set *fallback* to
+        ``False`` when another watch already covers this pod (see
+        :meth:`_watch_batch`).
+        """
+        with self._ready_lock:
+            ready = self._ready_events[self.jobname]
+
+        def watch_fallback():
+            try:
+                self._wait_pod_running(timeout=timeout)
+            except GromacsError:
+                return
+            ready.set()
+
+        if fallback:
+            threading.Thread(
+                target=watch_fallback, name="k8s-watch-fallback", daemon=True
+            ).start()
+        try:
+            if not ready.wait(timeout):
+                raise GromacsError(
+                    "Timed out after {0:d} s waiting for the pod of job "
+                    "{1!r}".format(timeout, self.jobname)
+                )
+        finally:
+            with self._ready_lock:
+                self._ready_events.pop(self.jobname, None)
+
+    def prehook(self, **kwargs):
+        """Create the Job and wait until its pod is running.
+
+        :Keywords:
+           *timeout*
+               maximum time in seconds to wait for the pod [300]
+           *defer*
+               do not submit yet but stage the runner for a batched
+               submission with :meth:`flush_pending` [``False``]
+        """
+        timeout = kwargs.pop("timeout", 300)
+        if self._submitted:
+            # already created by flush_pending()
+            return
+        if kwargs.pop("defer", False):
+            with self._pending_lock:
+                self._pending.append(self)
+            return
+        with self._pending_lock:
+            # a runner that was staged with defer=True but is run without
+            # flush_pending() is submitted here, so it must not be
+            # submitted a second time by a later flush_pending()
+            if self in self._pending:
+                self._pending.remove(self)
+        with self._ready_lock:
+            self._ready_events[self.jobname] = threading.Event()
+        batch_api = k8s_client.BatchV1Api(self._get_api_client())
+        logger.info(
+            "Creating Kubernetes job %r in namespace %r", self.jobname, self.namespace
+        )
+        batch_api.create_namespaced_job(self.namespace, self._make_job())
+        self._submitted = True
+        self._wait_ready(timeout=timeout)
+
+    @classmethod
+    def flush_pending(cls, timeout=300):
+        """Submit all deferred Jobs together and wait for all their pods.
+
+        All staged runners are labelled with a common ``mdrun-batch`` id and
+        created back-to-back over the shared API client, so N runners cost
+        one connection instead of N separate submissions; a *single* watch
+        on the batch label (plus the per-pod readiness callbacks) then
+        serves all waits. All runners of one batch must live in the same
+        namespace.
+        """
+        with cls._pending_lock:
+            pending, cls._pending = cls._pending[:], []
+        if not pending:
+            return
+        namespaces = set(runner.namespace for runner in pending)
+        if len(namespaces) > 1:
+            raise ValueError(
+                "all batched runners must use the same namespace, got "
+                "{0!r}".format(sorted(namespaces))
+            )
+        namespace = namespaces.pop()
+        batchid = uuid.uuid4().hex[:12]
+        batch_api = k8s_client.BatchV1Api(cls._get_api_client())
+        for runner in pending:
+            runner._batch = batchid
+            with cls._ready_lock:
+                cls._ready_events[runner.jobname] = threading.Event()
+        logger.info(
+            "Creating %d Kubernetes jobs as batch %r in namespace %r",
+            len(pending),
+            batchid,
+            namespace,
+        )
+        for runner in pending:
+            batch_api.create_namespaced_job(namespace, runner._make_job())
+            runner._submitted = True
+        threading.Thread(
+            target=cls._watch_batch,
+            args=(namespace, batchid, timeout),
+            name="k8s-batch-watch",
+            daemon=True,
+        ).start()
+        try:
+            for runner in pending:
+                runner._wait_ready(timeout=timeout, fallback=False)
+        finally:
+            # _wait_ready() only pops its own event, so when one wait
+            # fails, drop the entries of the runners never waited for
+            with cls._ready_lock:
+                for runner in pending:
+                    cls._ready_events.pop(runner.jobname, None)
+
+    @classmethod
+    @contextmanager
+    def batching(cls, timeout=300):
+        """Context manager that batches ``prehook(defer=True)`` submissions.
+
+        On exit, :meth:`flush_pending` submits everything that was staged
+        inside the ``with`` block::
+
+          runners = [MDrunnerK8s(pvc="data", dirname=d, deffnm="md")
+                     for d in windows]
+          with MDrunnerK8s.batching():
+              for runner in runners:
+                  runner.prehook(defer=True)
+          # all pods are running now; prehook() inside run() is a no-op
+
+        When the block raises, nothing is submitted and the runners that
+        were staged inside the block are discarded (otherwise an
+        unrelated later :meth:`flush_pending` would submit them).
+        """
+        with cls._pending_lock:
+            staged_before = list(cls._pending)
+        try:
+            yield cls
+        except BaseException:
+            with cls._pending_lock:
+                dropped = [r for r in cls._pending if r not in staged_before]
+                cls._pending = [r for r in cls._pending if r in staged_before]
+            if dropped:
+                logger.warning(
+                    "Discarding %d runner(s) staged in a batching block that raised",
+                    len(dropped),
+                )
+            raise
+        cls.flush_pending(timeout=timeout)
+
+    @classmethod
+    def _watch_batch(cls, namespace, batchid, timeout):
+        """Single watch serving all runners of one batch.
+
+        Sets the readiness event of every runner whose pod reaches phase
+        ``Running`` (fallback for pods whose push callback does not arrive).
+        """
+        core_api = k8s_client.CoreV1Api(cls._get_api_client())
+        watcher = k8s_watch.Watch()
+        try:
+            # server-side field selector: only Running pods reach us;
+            # resource_version="0" serves the initial list from the
+            # apiserver watch cache instead of etcd
+            for event in watcher.stream(
+                core_api.list_namespaced_pod,
+                namespace,
+                label_selector="mdrun-batch={0}".format(batchid),
+                field_selector="status.phase=Running",
+                resource_version="0",
+                timeout_seconds=timeout,
+            ):
+                if event["type"] not in ("ADDED", "MODIFIED"):
+                    continue
+                jobname = (event["object"].metadata.labels or {}).get("job")
+                with cls._ready_lock:
+                    ready = cls._ready_events.get(jobname)
+                if ready is not None:
+                    ready.set()
+        except Exception:
+            logger.exception("batch watch for %r failed", batchid)
+
+    def posthook(self, **kwargs):
+        """Delete the Job (and its pod) created by :meth:`prehook`.
+
+        The delete is fire-and-forget: the pod cleanup already happens
+        server-side (``propagation_policy="Background"``) so there is no
+        reason to block the caller on the apiserver round trip as well.
+        The worker is a non-daemon thread, i.e. the interpreter waits for
+        the delete request to go out before exiting.
+
+        The runner can be used again afterwards: a subsequent
+        :meth:`~gromacs.run.MDrunner.run` creates a fresh Job.
+
+        :Keywords:
+           *wait*
+               block until the delete request has been issued [``False``]
+        """
+
+        def delete():
+            try:
+                batch_api = k8s_client.BatchV1Api(self._get_api_client())
+                batch_api.delete_namespaced_job(
+                    self.jobname, self.namespace, propagation_policy="Background"
+                )
+            except Exception:
+                logger.exception("Deleting Kubernetes job %r failed", self.jobname)
+
+        logger.info("Deleting Kubernetes job %r", self.jobname)
+        # the Job is gone, so the next prehook() must submit a new one
+        self._submitted = False
+        worker = threading.Thread(target=delete, name="k8s-delete-job")
+        worker.start()
+        if kwargs.pop("wait", False):
+            worker.join()
+
+    def commandline(self, **mpiargs):
+        """Command line that runs ``mdrun`` inside the pod.
+
+        The command is prefixed with :program:`kubectl exec` so that
+        :meth:`MDrunner.run` can treat it like any local process (signals,
+        stdout/stderr, return code). The argv list is passed straight to
+        :class:`subprocess.Popen`, i.e. no shell and no quoting are
+        involved, and a TTY is only requested when we actually have one
+        (``-t`` makes the apiserver set up a terminal stream and mangles
+        line endings, which is pure overhead for scripted runs).
+        """
+        cmd = ["kubectl", "exec", "-i"]
+        if sys.stdin.isatty():
+            cmd.append("-t")
+        cmd.extend(["-n", self.namespace, "job/{0}".format(self.jobname), "--"])
+        cmd.extend(str(arg) for arg in self.MDRUN.commandline())
+        return cmd
@@ -205,7 +205,7 @@ class MDrunner(utilities.FileUtils):
         """
         # run MD in this directory (input files must be relative to this dir!)
         self.dirname = dirname
-        self.driver, self.name = find_gromacs_command(self.mdrun)
+        self.driver, self.name = self._find_command()
 
         # use a GromacsCommand class for handling arguments
         cls = type(
@@ -235,6 +235,14 @@ class MDrunner(utilities.FileUtils):
         self.signal_handled = False
         signal.signal(signal.SIGINT, self.signal_handler)
 
+    def _find_command(self):
+        """Find the ``mdrun`` executable on :envvar:`PATH`.
+
+        Override this method for runners that do not execute ``mdrun``
+        locally (e.g. :class:`gromacs.k8s.MDrunnerK8s`).
+        """
+        return find_gromacs_command(self.mdrun)
+
     def signal_handler(self, signum, frame):
         """Custom signal handler for SIGINT."""
         if self.process is not None:
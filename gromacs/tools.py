@@ -139,6 +139,8 @@ Gromacs tools. They are mostly of interest to developers.
 
 .. autodata:: NAMES5TO4
 .. autodata:: V4TOOLS
+.. autoclass:: ToolRegistry
+   :members:
 .. autofunction:: tool_factory
 .. autofunction:: load_v4_tools
 .. autofunction:: load_v5_tools
@@ -188,18 +190,78 @@ at run time.
 .. The following is autogenerated with sphinx.
 
 """
+import os
 import os.path
+import hashlib
+import json
 import tempfile
 import subprocess
 import atexit
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 from . import config
+from . import utilities
 from .core import GromacsCommand
 
 logger = logging.getLogger("gromacs.tools")
 
+#: Directory with the cached output of ``gmx help commands`` and ``gmx grompp
+#: -version``, so that repeated imports do not have to fork Gromacs again.
+#: Entries are keyed by the path and mtime of the driver binary and become
+#: invalid as soon as the binary changes.
+CACHEDIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser(os.path.join("~", ".cache"))),
+    "gromacswrapper",
+)
+
+
+def _cache_file(kind, executable):
+    digest = hashlib.sha1(executable.encode()).hexdigest()[:12]
+    return os.path.join(CACHEDIR, f"{kind}-{digest}.json")
+
+
+def _cache_load(kind, executable):
+    """Return the cached payload for *executable* or ``None`` on a miss.
+
+    A cache entry is only valid as long as the executable resolves to the
+    same path with the same mtime as when the entry was written.
+    """
+    path = utilities.which(executable)
+    if path is None:
+        return None
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+        with open(_cache_file(kind, executable)) as cachefile:
+            entry = json.load(cachefile)
+    except (OSError, ValueError):
+        return None
+    if entry.get("path") == path and entry.get("mtime_ns") == mtime_ns:
+        return entry.get("payload")
+    return None
+
+
+def _cache_store(kind, executable, payload):
+    """Store *payload* for *executable*, keyed by its path and mtime.
+
+    Failures are silently ignored; the cache is a pure optimization.
+    """
+    path = utilities.which(executable)
+    if path is None:
+        return
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+        os.makedirs(CACHEDIR, exist_ok=True)
+        cachefile = _cache_file(kind, executable)
+        tmpfile = f"{cachefile}.{os.getpid():d}.tmp"
+        with open(tmpfile, "w") as tmp:
+            json.dump({"path": path, "mtime_ns": mtime_ns, "payload": payload}, tmp)
+        os.replace(tmpfile, cachefile)
+    except OSError:
+        logger.debug("could not write tool cache for %r", executable, exc_info=True)
+
+
 #: List of tools coming with standard Gromacs 4.x.
 V4TOOLS = (
     "g_cluster",
@@ -342,11 +404,11 @@ class GromacsCommandMultiIndex(GromacsCommand):
 
     def __init__(self, **kwargs):
         kwargs = self._fake_multi_ndx(**kwargs)
-        super(GromacsCommandMultiIndex, self).__init__(**kwargs)
+        super().__init__(**kwargs)
 
     def run(self, *args, **kwargs):
         kwargs = self._fake_multi_ndx(**kwargs)
-        return super(GromacsCommandMultiIndex, self).run(*args, **kwargs)
+        return super().run(*args, **kwargs)
 
     def _fake_multi_ndx(self, **kwargs):
         ndx = kwargs.get("n")
@@ -366,6 +428,80 @@ def tool_factory(clsname, name, driver, base=GromacsCommand):
     return type(clsname, (base,), clsdict)
 
 
+class ToolSpec:
+    """Deferred description of a tool class for :class:`ToolRegistry`."""
+
+    __slots__ = ("clsname", "name", "driver", "base")
+
+    def __init__(self, clsname, name, driver, base=GromacsCommand):
+        self.clsname = clsname
+        self.name = name
+        self.driver = driver
+        self.base = base
+
+
+class ToolAlias:
+    """Entry in :class:`ToolRegistry` that resolves to another entry."""
+
+    __slots__ = ("target",)
+
+    def __init__(self, target):
+        self.target = target
+
+
+class ToolRegistry(dict):
+    """Mapping of identifiers to Gromacs command classes.
+
+    The loaders only deposit lightweight :class:`ToolSpec` entries (with
+    :meth:`add_spec`) or :class:`ToolAlias` entries (with
+    :meth:`add_alias`); the actual class is created with
+    :func:`tool_factory` on first access and cached, so importing the
+    module does not pay up front for the ~100 classes per driver. All read
+    accesses behave like a plain dict of classes.
+    """
+
+    def add_spec(self, clsname, name, driver, base=GromacsCommand):
+        """Register the tool *clsname* without materializing its class."""
+        dict.__setitem__(self, clsname, ToolSpec(clsname, name, driver, base))
+
+    def add_alias(self, alias, target):
+        """Make *alias* resolve to the same class as *target*."""
+        dict.__setitem__(self, alias, ToolAlias(target))
+
+    def spec(self, clsname):
+        """Return the raw :class:`ToolSpec` for *clsname* (following aliases).
+
+        Returns ``None`` when the entry was already materialized or is not
+        an autogenerated tool (such as :class:`Release`).
+        """
+        value = dict.__getitem__(self, clsname)
+        while isinstance(value, ToolAlias):
+            value = dict.__getitem__(self, value.target)
+        return value if isinstance(value, ToolSpec) else None
+
+    def __getitem__(self, clsname):
+        value = dict.__getitem__(self, clsname)
+        if isinstance(value, ToolAlias):
+            value = self[value.target]
+            dict.__setitem__(self, clsname, value)
+        elif isinstance(value, ToolSpec):
+            value = tool_factory(value.clsname, value.name, value.driver, value.base)
+            dict.__setitem__(self, clsname, value)
+        return value
+
+    def get(self, clsname, default=None):
+        try:
+            return self[clsname]
+        except KeyError:
+            return default
+
+    def items(self):
+        return [(clsname, self[clsname]) for clsname in self]
+
+    def values(self):
+        return [self[clsname] for clsname in self]
+
+
 def make_valid_identifier(name):
     """Turns tool names into valid identifiers.
 
@@ -384,26 +520,47 @@ def find_executables(path):
     :param path: dirname to search for
     :return: list of executables
     """
+    exclude = {
+        "GMXRC",
+        "GMXRC.bash",
+        "GMXRC.csh",
+        "GMXRC.zsh",
+        "demux.pl",
+        "xplor2gmx.pl",
+    }
     execs = []
-    for exe in os.listdir(path):
-        fullexe = os.path.join(path, exe)
-        if (
-            os.access(fullexe, os.X_OK)
-            and not os.path.isdir(fullexe)
-            and exe
-            not in [
-                "GMXRC",
-                "GMXRC.bash",
-                "GMXRC.csh",
-                "GMXRC.zsh",
-                "demux.pl",
-                "xplor2gmx.pl",
-            ]
-        ):
-            execs.append(exe)
+    # os.scandir reuses the stat information from the directory listing,
+    # saving one stat call per entry compared to os.path.isdir
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if (
+                entry.name not in exclude
+                and not entry.is_dir()
+                and os.access(entry.path, os.X_OK)
+            ):
+                execs.append(entry.name)
     return execs
 
 
+#: Matches one command name in the output of ``gmx -quiet help commands``:
+#: the name is the 4-space indented first column (continuation lines of the
+#: descriptions are indented further and header/footer lines start at the
+#: first column, so neither can match). The pattern works on the raw bytes
+#: so that only the matched names have to be decoded, not the whole output.
+_HELP_COMMAND = re.compile(rb"^    (?P<name>\S+)\s", re.MULTILINE)
+
+
+def _probe_driver(driver):
+    """Run ``driver -quiet help commands``.
+
+    :return: raw output as bytes, or ``None`` if the driver cannot be run
+    """
+    try:
+        return subprocess.check_output([driver, "-quiet", "help", "commands"])
+    except (subprocess.CalledProcessError, OSError):
+        return None
+
+
 def load_v5_tools():
     """Load Gromacs 2023/.../2016/5.x tools automatically using some heuristic.
 
@@ -412,7 +569,7 @@ def load_v5_tools():
 
     In all cases the command ``gmx help`` is run to get all tools available.
 
-    :return: dict mapping tool names to GromacsCommand classes
+    :return: :class:`ToolRegistry` mapping tool names to GromacsCommand classes
     """
     logger.debug("Loading 2023/.../2016/5.x tools...")
 
@@ -424,35 +581,42 @@ def load_v5_tools():
     if len(drivers) == 0 or len(drivers) > 4:
         drivers = ["gmx", "gmx_d", "gmx_mpi", "gmx_mpi_d"]
 
-    append = config.cfg.getboolean("Gromacs", "append_suffix", fallback=True)
+    append = config.get_boolean("Gromacs", "append_suffix", fallback=True)
 
-    tools = {}
+    cached = {driver: _cache_load("commands", driver) for driver in drivers}
+    uncached = [driver for driver in drivers if cached[driver] is None]
+    outputs = {}
+    if uncached:
+        # the probes are independent fork+exec calls, so run them
+        # concurrently: wall time is the slowest driver, not the sum
+        with ThreadPoolExecutor(max_workers=len(uncached)) as pool:
+            outputs = dict(zip(uncached, pool.map(_probe_driver, uncached)))
+
+    # parsing and spec registration stay on the main thread so that the
+    # order of `tools` (and hence of the registry) follows `drivers`
+    tools = ToolRegistry()
     for driver in drivers:
         suffix = driver.partition("_")[2]
-        try:
-            out = subprocess.check_output([driver, "-quiet", "help", "commands"])
-            for line in out.splitlines()[5:-1]:
-                line = str(
-                    line.decode("ascii")
-                )  # Python 3: byte string -> str, Python 2: normal string
-
-                if len(line) > 4:
-                    if (line[4] != " ") and (" " in line[4:]):
-                        name = line[4 : line.index(" ", 4)]
-                        fancy = make_valid_identifier(name)
-                        if suffix and append:
-                            fancy = "{0!s}_{1!s}".format(fancy, suffix)
-                        tools[fancy] = tool_factory(fancy, name, driver)
-        except (subprocess.CalledProcessError, OSError):
-            pass
+        names = cached[driver]
+        if names is None:
+            out = outputs.get(driver)
+            if out is None:
+                continue
+            names = [
+                m.group("name").decode("ascii") for m in _HELP_COMMAND.finditer(out)
+            ]
+            _cache_store("commands", driver, names)
+        for name in names:
+            fancy = make_valid_identifier(name)
+            if suffix and append:
+                fancy = f"{fancy}_{suffix}"
+            tools.add_spec(fancy, name, driver)
 
     if not tools:
-        errmsg = "Failed to load 2023/.../2016/5.x tools (tried drivers: {})".format(
-            drivers
-        )
+        errmsg = f"Failed to load 2023/.../2016/5.x tools (tried drivers: {drivers})"
         logger.debug(errmsg)
         raise GromacsToolLoadingError(errmsg)
-    logger.debug("Loaded {0} v5 tools successfully!".format(len(tools)))
+    logger.debug(f"Loaded {len(tools)} v5 tools successfully!")
     return tools
 
 
@@ -464,7 +628,7 @@ def load_v4_tools():
 
     Also load any extra tool configured in ``~/.gromacswrapper.cfg``
 
-    :return: dict mapping tool names to GromacsCommand classes
+    :return: :class:`ToolRegistry` mapping tool names to GromacsCommand classes
     """
     logger.debug("Loading v4 tools...")
 
@@ -478,16 +642,16 @@ def load_v4_tools():
 
     names.extend(config.get_extra_tool_names())
 
-    tools = {}
+    tools = ToolRegistry()
     for name in names:
         fancy = make_valid_identifier(name)
-        tools[fancy] = tool_factory(fancy, name, None)
+        tools.add_spec(fancy, name, None)
 
     if not tools:
         errmsg = "Failed to load v4 tools"
         logger.debug(errmsg)
         raise GromacsToolLoadingError(errmsg)
-    logger.debug("Loaded {0} v4 tools successfully!".format(len(tools)))
+    logger.debug(f"Loaded {len(tools)} v4 tools successfully!")
     return tools
 
 
@@ -560,39 +724,43 @@ else:
 # Aliases command names to run unmodified GromacsWrapper scripts on a machine
 # with only 5.x
 # update with temporary directory
-for fancy, cmd in list(registry.items()):
-    for c5, c4 in NAMES5TO4.items():
-        # have to check each one, since it's possible there are suffixes
-        # like for double precision; cmd.command_name is Gromacs name
-        # (e.g. 'convert-tpr') so we need to be careful in the processing below.
-        name = cmd.command_name
-        if name.startswith(c5):
-            if c4 == c5:
-                break
-            else:
-                # maintain suffix (note: need to split with fancy because Gromacs
-                # names (c5) may contain '-' etc)
-                name = c4 + fancy.split(make_valid_identifier(c5))[1]
-                registry[make_valid_identifier(name)] = registry[fancy]
-                break
-    else:
+# (spec.name is the literal Gromacs name without any precision suffix --
+# suffixes only appear in the identifier -- so each entry maps to its alias
+# with a single dict lookup instead of scanning all of NAMES5TO4)
+_IDENTIFIERS5TO4 = {c5: (c4, make_valid_identifier(c5)) for c5, c4 in NAMES5TO4.items()}
+for fancy in list(registry):
+    spec = registry.spec(fancy)
+    if spec is None:
+        continue
+    try:
+        c4, fancy5 = _IDENTIFIERS5TO4[spec.name]
+    except KeyError:
         # the common case of just adding the 'g_'
-        registry["G_{0!s}".format(fancy.lower())] = registry[fancy]
+        registry.add_alias(f"G_{fancy.lower()}", fancy)
+        continue
+    if c4 != spec.name:
+        # maintain suffix (note: need to split with fancy because Gromacs
+        # names (c5) may contain '-' etc)
+        registry.add_alias(make_valid_identifier(c4 + fancy.split(fancy5)[1]), fancy)
 
 
 # Patching up commands that may be useful to accept multiple index files
 for name4, name5 in [("G_mindist", "Mindist"), ("G_dist", "Distance")]:
     if name4 in registry:
-        cmd = registry[name4]
-        registry[name4] = tool_factory(
-            name4, cmd.command_name, cmd.driver, GromacsCommandMultiIndex
-        )
+        spec = registry.spec(name4)
+        if spec is not None:
+            registry.add_spec(name4, spec.name, spec.driver, GromacsCommandMultiIndex)
+        else:
+            cmd = registry[name4]
+            registry[name4] = tool_factory(
+                name4, cmd.command_name, cmd.driver, GromacsCommandMultiIndex
+            )
         if name5 in registry:
-            registry[name5] = registry[name4]
+            registry.add_alias(name5, name4)
 
 
 # create a release "virtual command" (issue #161)
-class Release(object):
+class Release:
     """Release string of the currently loaded Gromacs version.
 
     :return:   str,
@@ -623,27 +791,71 @@ class Release(object):
 
     .. versionadded:: 0.8.0
 
+    .. versionchanged:: 0.9.0
+       ``grompp -version`` is only run (and memoized) when the release
+       string is first accessed instead of when the instance is created.
+
     """
 
+    #: precompiled (once, at class definition) pattern for the version line;
+    #: MULTILINE so that the raw output can be searched in one pass without
+    #: splitting and stripping individual lines
     gromacs_version = re.compile(
-        "^G[rR][oO][mM][aA][cC][sS] version:" "\s*(VERSION)?\s*(?P<version>.+)$"
+        r"^\s*G[rR][oO][mM][aA][cC][sS] version:\s*(VERSION)?\s*(?P<version>.+?)\s*$",
+        re.MULTILINE,
     )
 
+    #: sentinel: the release has not been determined yet
+    _NOTDETERMINED = object()
+
     def __init__(self):
-        self.release = None
+        # determining the release forks grompp, so it is deferred to the
+        # first access of :attr:`release` and memoized
+        self._release = self._NOTDETERMINED
+
+    @property
+    def release(self):
+        if self._release is self._NOTDETERMINED:
+            self._release = self._determine()
+        return self._release
+
+    def _determine(self):
+        """Run ``grompp -version`` once and return the release string.
+
+        Returns ``None`` when Gromacs cannot be found or the output does
+        not contain a version line.
+        """
         try:
-            grompp = registry["Grompp"]()
-            rc, out, err = grompp(version=True, stdout=False, stderr=False)
-            output_lines = out.splitlines() + err.splitlines()
+            grompp_cls = registry["Grompp"]
         except KeyError:
-            output_lines = []
+            return None
 
-        for line in output_lines:
-            line = line.strip()
-            m = self.gromacs_version.match(line)
-            if m:
-                self.release = m.group("version")
-                break
+        # the version string is cached on disk (keyed by the binary's
+        # mtime) so that re-imports do not have to run grompp again
+        executable = grompp_cls.driver or grompp_cls.command_name
+        cached = _cache_load("release", executable)
+        if cached is not None:
+            return cached
+
+        try:
+            grompp = grompp_cls()
+            rc, out, err = grompp(version=True, stdout=False, stderr=False)
+        except EnvironmentError:  # includes OSError and GromacsError
+            logger.debug(
+                "could not run %r to determine the Gromacs release",
+                executable,
+                exc_info=True,
+            )
+            return None
+
+        # core runs commands with universal_newlines=True so the output is
+        # already text; search it in one pass instead of line by line
+        m = self.gromacs_version.search(out) or self.gromacs_version.search(err)
+        release = m.group("version") if m else None
+
+        if release is not None:
+            _cache_store("release", executable, release)
+        return release
 
     def __call__(self):
         if self.release is None:
@@ -672,11 +884,22 @@ class Release(object):
 
 # Append class doc for each command
 for name in registry.keys():
-    __doc__ += ".. class:: {0!s}\n    :noindex:\n".format(name)
+    __doc__ += f".. class:: {name}\n    :noindex:\n"
 
 registry["Release"] = Release
 
-# Finally add command classes to module's scope
-globals().update(registry)
 __all__ = ["GromacsCommandMultiIndex", "merge_ndx"]
 __all__.extend(list(registry.keys()))
+
+
+def __getattr__(name):
+    """Materialize tool classes on first attribute access (:pep:`562`).
+
+    Command classes are no longer copied into the module namespace at
+    import time; they are created by the :data:`registry` the first time
+    somebody asks for them (e.g. ``gromacs.tools.Trjconv``).
+    """
+    try:
+        return registry[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
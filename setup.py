@@ -69,6 +69,9 @@ setup(
         "numpy>=1.0",
         'setuptools; python_version >= "3.12"',  # contains 'pkg_resources' for versioneer
     ],
+    extras_require={
+        "k8s": ["kubernetes"],  # for gromacs.k8s
+    },
     tests_require=["pytest", "pandas>=0.17"],
     zip_safe=True,
 )
@@ -0,0 +1,130 @@
+# GromacsWrapper: test_k8s.py
+# Copyright (c) 2009 Oliver Beckstein <orbeckst@gmail.com>
+# Released under the GNU Public License 3 (or higher, your choice)
+# See the file COPYING for details.
+
+import pytest
+
+pytest.importorskip("kubernetes")
+
+import gromacs.k8s
+
+
+@pytest.fixture
+def mdrunner():
+    return gromacs.k8s.MDrunnerK8s(
+        pvc="shared-data",
+        jobname="testjob",
+        namespace="testing",
+        s="md.tpr",
+        deffnm="md",
+    )
+
+
+def test_pvc_required():
+    with pytest.raises(ValueError):
+        gromacs.k8s.MDrunnerK8s(deffnm="md")
+
+
+def test_find_backing_volume(tmp_path, monkeypatch):
+    mounts = tmp_path / "mounts"
+    mounts.write_text(
+        "proc /proc proc rw 0 0\n"
+        "overlay / overlay rw 0 0\n"
+        "10.0.0.1:/export/pvc-0123abcd-de-ad /data nfs rw 0 0\n"
+    )
+    monkeypatch.setattr(gromacs.k8s, "PROC_MOUNTS", str(mounts))
+    find = gromacs.k8s.MDrunnerK8s._find_backing_volume
+    assert find("/data/run1") == "pvc-0123abcd-de-ad"
+    assert find("/datadir") is None
+
+
+def test_job_manifest(mdrunner):
+    job = mdrunner._make_job()
+    assert job["kind"] == "Job"
+    assert job["metadata"]["name"] == "testjob"
+    assert job["metadata"]["labels"]["job"] == "testjob"
+    container = job["spec"]["template"]["spec"]["containers"][0]
+    assert container["image"] == gromacs.k8s.MDrunnerK8s.image
+    assert container["resources"]["requests"]["cpu"] == 1
+    volume = job["spec"]["template"]["spec"]["volumes"][0]
+    assert volume["persistentVolumeClaim"]["claimName"] == "shared-data"
+
+
+def test_job_manifest_gpus():
+    mdrunner = gromacs.k8s.MDrunnerK8s(
+        pvc="shared-data", namespace="testing", gpus=2, deffnm="md"
+    )
+    job = mdrunner._make_job()
+    resources = job["spec"]["template"]["spec"]["containers"][0]["resources"]
+    assert resources["requests"]["nvidia.com/gpu"] == 2
+    assert resources["limits"]["nvidia.com/gpu"] == 2
+
+
+def test_job_manifest_callback(mdrunner):
+    job = mdrunner._make_job()
+    container = job["spec"]["template"]["spec"]["containers"][0]
+    env = {var["name"]: var["value"] for var in container["env"]}
+    assert env["JOBNAME"] == "testjob"
+    assert env["CALLBACK_URL"].startswith("http://")
+
+
+def test_ready_callback(mdrunner):
+    import http.client
+    import threading
+
+    cls = gromacs.k8s.MDrunnerK8s
+    with cls._ready_lock:
+        cls._ready_events["testjob"] = event = threading.Event()
+    try:
+        port = cls._get_ready_server().server_address[1]
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        conn.request("POST", "/ready/testjob")
+        assert conn.getresponse().status == 204
+        conn.close()
+        assert event.wait(10)
+    finally:
+        with cls._ready_lock:
+            cls._ready_events.pop("testjob", None)
+
+
+def test_prehook_defer(mdrunner):
+    cls = gromacs.k8s.MDrunnerK8s
+    mdrunner.prehook(defer=True)
+    try:
+        with cls._pending_lock:
+            assert mdrunner in cls._pending
+    finally:
+        with cls._pending_lock:
+            cls._pending.remove(mdrunner)
+
+
+def test_batching_discards_on_error(mdrunner):
+    cls = gromacs.k8s.MDrunnerK8s
+    with pytest.raises(RuntimeError):
+        with cls.batching():
+            mdrunner.prehook(defer=True)
+            raise RuntimeError("boom")
+    with cls._pending_lock:
+        assert mdrunner not in cls._pending
+
+
+def test_job_manifest_batch_label(mdrunner):
+    mdrunner._batch = "abc123"
+    job = mdrunner._make_job()
+    assert job["metadata"]["labels"]["mdrun-batch"] == "abc123"
+    assert job["spec"]["template"]["metadata"]["labels"]["mdrun-batch"] == "abc123"
+
+
+def test_commandline(mdrunner):
+    cmd = mdrunner.commandline()
+    assert cmd[:2] == ["kubectl", "exec"]
+    assert "job/testjob" in cmd
+    assert "mdrun" in cmd[cmd.index("--") :]
+
+
+def test_commandline_no_tty_when_not_interactive(mdrunner, monkeypatch):
+    monkeypatch.setattr(
+        "sys.stdin", type("FakeStdin", (), {"isatty": lambda self: False})()
+    )
+    assert "-t" not in mdrunner.commandline()
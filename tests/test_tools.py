@@ -5,6 +5,8 @@
 
 from __future__ import division, absolute_import, print_function
 
+import os
+
 import pytest
 
 import gromacs
@@ -60,6 +62,62 @@ def test_failure_ignore():
         raise AssertionError("Should have ignored exception {}".format(err))
 
 
+SAMPLE_HELP_COMMANDS = b"""\
+Usage: gmx [-[no]h] [-[no]quiet] [-[no]version] [-nice <int>] [-[no]backup]
+           [<command> [<args>]]
+
+Available commands:
+    anadock      Cluster structures from docking runs
+    convert-tpr  Make a modified run-input file
+    do_dssp      Assign secondary structure and calculate solvent accessible
+                 surface area
+For additional help on a command, use 'gmx help <command>'
+"""
+
+
+def test_help_command_parsing():
+    names = [
+        m.group("name").decode("ascii")
+        for m in gromacs.tools._HELP_COMMAND.finditer(SAMPLE_HELP_COMMANDS)
+    ]
+    assert names == ["anadock", "convert-tpr", "do_dssp"]
+
+
+class TestToolCache(object):
+    @pytest.fixture
+    def cachedir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(gromacs.tools, "CACHEDIR", str(tmp_path / "cache"))
+        return tmp_path
+
+    @pytest.fixture
+    def executable(self, tmp_path):
+        exe = tmp_path / "fakegmx"
+        exe.write_text("#!/bin/sh\n")
+        exe.chmod(0o755)
+        return str(exe)
+
+    def test_roundtrip(self, cachedir, executable):
+        gromacs.tools._cache_store("commands", executable, ["grompp", "mdrun"])
+        assert gromacs.tools._cache_load("commands", executable) == [
+            "grompp",
+            "mdrun",
+        ]
+
+    def test_miss_without_entry(self, cachedir, executable):
+        assert gromacs.tools._cache_load("commands", executable) is None
+
+    def test_invalidated_when_executable_changes(self, cachedir, executable):
+        gromacs.tools._cache_store("release", executable, "2023.1")
+        os.utime(executable, ns=(0, 0))
+        assert gromacs.tools._cache_load("release", executable) is None
+
+    def test_missing_executable(self, cachedir, tmp_path):
+        missing = str(tmp_path / "nosuchgmx")
+        assert gromacs.tools._cache_load("commands", missing) is None
+        # storing must not raise either
+        gromacs.tools._cache_store("commands", missing, [])
+
+
 class TestRelease(object):
     # add tested releases here
     major_releases = ("4", "5", "2016", "2018", "2019", "2020", "2021", "2022", "2023")